@@ -0,0 +1,84 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PomodoroCountDialog:
+    """ポモドーロカウント編集ダイアログ
+
+    ダイアログは一度だけ作成し、閉じる時は破棄せずに隠す。
+    """
+
+    def __init__(self, parent, save_callback):
+        self.window = tk.Toplevel(parent)
+        self.window.withdraw()
+        self.window.title("ポモドーロカウント編集")
+        self.window.geometry("250x120")
+        self.window.resizable(False, False)
+
+        self.save_callback = save_callback
+
+        # 閉じるボタンでは破棄せずに隠す
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        # メインフレーム
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # カウント入力
+        count_frame = ttk.Frame(main_frame)
+        count_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Label(count_frame, text="カウント:").pack(side=tk.LEFT)
+        self.count = tk.StringVar()
+        self.count_entry = ttk.Entry(count_frame, textvariable=self.count, width=10)
+        self.count_entry.pack(side=tk.LEFT, padx=5)
+
+        # ボタンフレーム
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+
+        ttk.Button(
+            button_frame,
+            text="キャンセル",
+            command=self.hide
+        ).pack(side=tk.RIGHT)
+
+        ttk.Button(
+            button_frame,
+            text="保存",
+            command=self.save_count
+        ).pack(side=tk.RIGHT, padx=5)
+
+        self.window.transient(parent)
+
+    def show(self, count):
+        """現在のカウントを反映してダイアログを表示"""
+        self.count.set(str(count))
+
+        # モーダルウィンドウとして表示
+        self.window.deiconify()
+        self.window.lift()
+        self.window.grab_set()
+        self.count_entry.focus()
+
+    def hide(self):
+        """ダイアログを隠す"""
+        self.window.grab_release()
+        self.window.withdraw()
+
+    def save_count(self):
+        """入力されたカウントを保存"""
+        try:
+            new_count = int(self.count.get())
+            if new_count < 0:
+                raise ValueError("カウントは0以上の値を入力してください")
+
+            self.save_callback(new_count)
+            self.hide()
+
+        except ValueError as e:
+            logger.error(f"カウントの保存に失敗: {e}")
+            messagebox.showerror("エラー", str(e))
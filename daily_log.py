@@ -0,0 +1,101 @@
+import csv
+import logging
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LOG_DIR = "log"
+LOG_HEADER = [
+    "タイムスタンプ",
+    "開始時刻",
+    "リセット時刻",
+    "中断時刻",
+    "状態",
+    "カウント",
+]
+
+
+def log_file_for(date_str, log_dir=LOG_DIR):
+    """日付文字列に対応するログファイルのパスを返す"""
+    return f"{log_dir}/pomodoro_log_{date_str}.csv"
+
+
+class DailyLog:
+    """日ごとのCSVログファイルを管理する
+
+    次のローカル時刻の午前0時を事前に計算しておき、切り替えは
+    rollover() を呼んだときだけ行う。書き込みごとの日付判定はしない。
+    """
+
+    def __init__(self, log_dir=LOG_DIR, now=None, create=True):
+        """create が False の場合、ディレクトリとファイルは既にあるものとする"""
+        self.log_dir = log_dir
+        if create:
+            Path(self.log_dir).mkdir(exist_ok=True)
+        self._open_day(now or datetime.now(), create)
+
+    def _open_day(self, now, create=True):
+        """指定時刻の日付のログファイルを使用するように切り替え"""
+        self.date = now.strftime("%Y-%m-%d")
+        self.csv_file = log_file_for(self.date, self.log_dir)
+        self.next_midnight = datetime.combine(
+            now.date() + timedelta(days=1), time.min
+        )
+        if create:
+            self.ensure_csv_file()
+
+    def ensure_csv_file(self):
+        """CSVファイルが存在しない場合、新規作成"""
+        if not Path(self.csv_file).exists():
+            with open(self.csv_file, mode="w", newline="", encoding="shift_jis") as file:
+                writer = csv.writer(file)
+                writer.writerow(LOG_HEADER)
+
+    def seconds_until_rollover(self, now=None):
+        """次の日付切り替えまでの秒数を返す"""
+        now = now or datetime.now()
+        return max(0.0, (self.next_midnight - now).total_seconds())
+
+    def rollover(self, now=None):
+        """午前0時を過ぎていれば新しい日のファイルに切り替える
+
+        切り替えた場合は True を返す。
+        """
+        now = now or datetime.now()
+        if now < self.next_midnight:
+            return False
+
+        previous = self.csv_file
+        self._open_day(now)
+        logger.info(f"ログファイルを切り替え: {previous} -> {self.csv_file}")
+        return True
+
+    def write(self, row):
+        """1行をログファイルに追記"""
+        try:
+            with open(self.csv_file, mode="a", newline="", encoding="shift_jis") as file:
+                writer = csv.writer(file)
+                writer.writerow(row)
+        except Exception as e:
+            logger.error(f"ログの書き込みに失敗: {e}")
+
+    def read_max_count(self):
+        """当日のログから最大のカウント値を取得"""
+        pomodoro_count = 0
+
+        try:
+            with open(self.csv_file, mode="r", encoding="shift_jis") as file:
+                reader = csv.reader(file)
+                next(reader, None)  # ヘッダーをスキップ
+                for row in reader:
+                    if row and row[0].startswith(self.date):
+                        try:
+                            count = int(row[5]) if len(row) > 5 and row[5].strip() else 0
+                            pomodoro_count = max(pomodoro_count, count)
+                        except ValueError:
+                            logger.warning(f"無効なカウント値を検出: {row[5]}")
+        except Exception as e:
+            logger.error(f"ログの読み込みに失敗: {e}")
+
+        return pomodoro_count
@@ -0,0 +1,151 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from daily_log import LOG_DIR
+from history import (
+    SECONDS_PER_DAY,
+    STATE_BREAK_START,
+    STATE_RESET,
+    STATE_WORK_INTERRUPT,
+    STATE_WORK_START,
+    load_history,
+)
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ["月", "火", "水", "木", "金", "土", "日"]
+HOURS_PER_DAY = 24
+
+
+def analyze(history, min_samples=3, top=5):
+    """作業フェーズの成否を時間帯×曜日ごとに集計
+
+    作業の開始行から次の行までを1つの作業区間とみなす。一時停止後の
+    再開行（作業の中断の直後の開始行）と、日付をまたいだ時に書かれる
+    午前0時の開始行は、それまでのフェーズの続きとして扱う。
+
+    フェーズは開始時刻の曜日×時間帯に1回だけ数え、休憩の開始まで
+    進めば完了、リセットされるか再開されずに終われば中断とする。
+    平均中断時間は、各中断（一時停止とリセット）のフェーズの開始からの時間。
+    """
+    order = np.argsort(history["timestamp"], kind="stable")
+    timestamp = history["timestamp"][order]
+    state = history["state"][order]
+
+    # 前の行の状態（先頭は該当なし）
+    previous = np.concatenate(([np.iinfo(state.dtype).max], state))[:-1].astype(state.dtype)
+    is_start = state == STATE_WORK_START
+    resumed = is_start & (previous == STATE_WORK_INTERRUPT)
+    carried = is_start & (previous == STATE_WORK_START) & (timestamp % SECONDS_PER_DAY == 0)
+    begins = is_start & ~resumed & ~carried
+
+    # 各行が属するフェーズの開始時刻（直前のフェーズがない再開行は自身から）
+    index = np.arange(len(state))
+    phase_begin = np.maximum.accumulate(np.where(begins, index, -1))
+    phase_start = timestamp[np.where(phase_begin >= 0, phase_begin, index)]
+
+    current = state[:-1]
+    following = state[1:]
+    start = phase_start[:-1]
+
+    is_work = current == STATE_WORK_START
+    completed = is_work & (following == STATE_BREAK_START)
+    paused = is_work & (following == STATE_WORK_INTERRUPT)
+    reset = is_work & (following == STATE_RESET)
+    # 一時停止の後に再開されたものはフェーズの中断に含めない
+    abandoned = paused & ~np.append(resumed[2:], False)
+    interrupted = abandoned | reset
+
+    # 1970-01-01 は木曜日なので、月曜日を0とするために3日ずらす
+    hour = (start % SECONDS_PER_DAY) // 3600
+    weekday = (start // SECONDS_PER_DAY + 3) % 7
+    cell = weekday * HOURS_PER_DAY + hour
+
+    cells = len(WEEKDAYS) * HOURS_PER_DAY
+    completed_map = np.bincount(cell[completed], minlength=cells)
+    interrupted_map = np.bincount(cell[interrupted], minlength=cells)
+    total_map = completed_map + interrupted_map
+
+    # 完了率の高い時間帯（試行回数が少ないものは除外）
+    rate = np.divide(
+        completed_map,
+        total_map,
+        out=np.zeros(cells, dtype=np.float64),
+        where=total_map > 0,
+    )
+    candidates = np.flatnonzero(total_map >= min_samples)
+    ranking = candidates[
+        np.lexsort((-total_map[candidates], -rate[candidates]))
+    ][:top]
+
+    interruption = paused | reset
+    interrupted_elapsed = timestamp[1:][interruption] - start[interruption]
+    return {
+        "completed": completed_map.reshape(len(WEEKDAYS), HOURS_PER_DAY),
+        "interrupted": interrupted_map.reshape(len(WEEKDAYS), HOURS_PER_DAY),
+        "average_interruption_offset": (
+            float(interrupted_elapsed.mean()) if interrupted_elapsed.size else None
+        ),
+        "best_windows": [
+            (int(c // HOURS_PER_DAY), int(c % HOURS_PER_DAY), float(rate[c]), int(total_map[c]))
+            for c in ranking
+        ],
+    }
+
+
+def format_heatmap(title, heatmap):
+    """曜日×時間帯の表を文字列に整形"""
+    lines = [title, "    " + "".join(f"{h:>4d}" for h in range(HOURS_PER_DAY))]
+    for weekday, row in zip(WEEKDAYS, heatmap):
+        lines.append(f"{weekday}  " + "".join(f"{v:>4d}" for v in row))
+    return "\n".join(lines)
+
+
+def format_report(report):
+    """集計結果をテキストに整形"""
+    sections = [
+        format_heatmap("完了した作業フェーズ（曜日×開始時刻）", report["completed"]),
+        format_heatmap("中断された作業フェーズ（曜日×開始時刻）", report["interrupted"]),
+    ]
+
+    offset = report["average_interruption_offset"]
+    if offset is None:
+        sections.append("平均中断時間: 中断なし")
+    else:
+        minutes, seconds = divmod(int(offset), 60)
+        sections.append(f"平均中断時間: 開始から {minutes}分{seconds:02d}秒")
+
+    lines = ["集中しやすい時間帯:"]
+    for weekday, hour, rate, total in report["best_windows"]:
+        lines.append(
+            f"  {WEEKDAYS[weekday]} {hour:02d}:00-{hour + 1:02d}:00  "
+            f"完了率 {rate:.0%}（{total}回）"
+        )
+    if not report["best_windows"]:
+        lines.append("  データが不足しています")
+    sections.append("\n".join(lines))
+
+    return "\n\n".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作業フェーズの時間帯別レポートを表示")
+    parser.add_argument("log_dir", nargs="?", default=LOG_DIR, help="ログディレクトリ")
+    parser.add_argument("--min-samples", type=int, default=3, help="集中しやすい時間帯の最小試行回数")
+    parser.add_argument("--top", type=int, default=5, help="表示する時間帯の数")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    history = load_history(args.log_dir)
+    report = analyze(history, min_samples=args.min_samples, top=args.top)
+    elapsed = time.perf_counter() - started
+
+    print(format_report(report))
+    print(f"\n{len(history['timestamp'])}行を{elapsed:.3f}秒で集計しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from daily_log import LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+# ログの各行を表す状態コード
+STATE_WORK_START = 0
+STATE_BREAK_START = 1
+STATE_WORK_INTERRUPT = 2
+STATE_BREAK_INTERRUPT = 3
+STATE_RESET = 4
+
+# 状態コードと (開始/中断, 状態) の対応
+_START_CODES = {"work": STATE_WORK_START, "break": STATE_BREAK_START}
+_INTERRUPT_CODES = {"work": STATE_WORK_INTERRUPT, "break": STATE_BREAK_INTERRUPT}
+
+TIMESTAMP_WIDTH = len("YYYY-MM-DD HH:MM:SS")
+SECONDS_PER_DAY = 86400
+
+# カウントが空欄の行に使う値
+NO_COUNT = -1
+
+
+def days_from_civil(year, month, day):
+    """年月日の配列を1970-01-01からの日数に変換"""
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def parse_timestamps(timestamps):
+    """"YYYY-MM-DD HH:MM:SS" 形式の文字列を連結したバイト列を秒に変換
+
+    タイムスタンプはローカル時刻のまま、1970-01-01 00:00:00 からの
+    秒数として扱う。
+    """
+    digits = np.frombuffer(timestamps, dtype=np.uint8).reshape(-1, TIMESTAMP_WIDTH)
+    digits = digits.astype(np.int64) - ord("0")
+
+    def field(start, width):
+        value = digits[:, start]
+        for i in range(start + 1, start + width):
+            value = value * 10 + digits[:, i]
+        return value
+
+    days = days_from_civil(field(0, 4), field(5, 2), field(8, 2))
+    return days * SECONDS_PER_DAY + field(11, 2) * 3600 + field(14, 2) * 60 + field(17, 2)
+
+
+def _parse_row(fields):
+    """CSVの1行を (状態コード, カウント) に変換。対象外の行は None"""
+    if len(fields) < 6 or len(fields[0]) != TIMESTAMP_WIDTH or not fields[0].isascii():
+        return None
+
+    if fields[1]:
+        state = _START_CODES.get(fields[4])
+    elif fields[2]:
+        state = STATE_RESET
+    elif fields[3]:
+        state = _INTERRUPT_CODES.get(fields[4])
+    else:
+        state = None
+    if state is None:
+        return None
+
+    count = fields[5].strip()
+    return state, int(count) if count.isdigit() else NO_COUNT
+
+
+def log_files(log_dir=LOG_DIR):
+    """ログディレクトリ内の日別CSVファイルを日付順に返す"""
+    return sorted(Path(log_dir).glob("pomodoro_log_????-??-??.csv"))
+
+
+def load_history(log_dir=LOG_DIR):
+    """ログディレクトリ全体を列ごとのNumPy配列として読み込む
+
+    行の順序はファイル（日付）順、ファイル内は書き込み順のまま。
+    戻り値は以下のキーを持つ辞書:
+
+    - timestamp: int64 ローカル時刻の秒
+    - state: uint8 状態コード（STATE_*）
+    - count: int32 カウント（空欄は NO_COUNT）
+    - day: int32 その行が書かれたファイルの日付（1970-01-01からの日数）
+    - days: int32 存在するすべてのファイルの日付
+    - skipped: 形式が不正で読み込まなかった行の数（空行は除く）
+    """
+    timestamps = []
+    states = []
+    counts = []
+    rows_per_file = []
+    file_days = []
+    skipped = 0
+
+    for path in log_files(log_dir):
+        try:
+            text = path.read_bytes().decode("shift_jis")
+        except Exception as e:
+            logger.error(f"ログの読み込みに失敗: {path}: {e}")
+            continue
+
+        file_days.append(path.stem[-10:])
+        rows = 0
+        for line in text.splitlines()[1:]:
+            fields = line.split(",")
+            parsed = _parse_row(fields)
+            if parsed is None:
+                skipped += bool(line.strip())
+                continue
+            timestamps.append(fields[0])
+            states.append(parsed[0])
+            counts.append(parsed[1])
+            rows += 1
+        rows_per_file.append(rows)
+
+    if file_days:
+        days = parse_timestamps(
+            "".join(f"{d} 00:00:00" for d in file_days).encode("ascii")
+        ) // SECONDS_PER_DAY
+    else:
+        days = np.empty(0, dtype=np.int64)
+
+    if timestamps:
+        timestamp = parse_timestamps("".join(timestamps).encode("ascii"))
+    else:
+        timestamp = np.empty(0, dtype=np.int64)
+
+    return {
+        "timestamp": timestamp.astype(np.int64),
+        "state": np.array(states, dtype=np.uint8),
+        "count": np.array(counts, dtype=np.int32),
+        "day": np.repeat(days, rows_per_file).astype(np.int32),
+        "days": days.astype(np.int32),
+        "skipped": skipped,
+    }
@@ -0,0 +1,261 @@
+"""ログ履歴の列指向バイナリ形式への書き出しと読み込み
+
+ファイルは72バイトのヘッダーと、8バイト境界に揃えた固定長の列で構成される。
+数値はすべてリトルエンディアン。
+
+    オフセット  型        内容
+    0           8s        マジック b"PMHIST\\0\\0"
+    8           uint16    形式のバージョン
+    10          uint16    列の数
+    12          uint32    予約（0）
+    16          uint64    行数
+    24          uint64    日数
+    32          uint64×5  各列の先頭オフセット（COLUMNS の順）
+
+列はメモリマップしてそのまま NumPy 配列として読める（open_archive）。
+
+    python history_archive.py export history.pmh
+    python history_archive.py import history.pmh --log-dir restored_log
+    python history_archive.py verify history.pmh
+"""
+import argparse
+import csv
+import logging
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from daily_log import LOG_DIR, LOG_HEADER, log_file_for
+from history import (
+    NO_COUNT,
+    SECONDS_PER_DAY,
+    STATE_BREAK_INTERRUPT,
+    STATE_BREAK_START,
+    STATE_RESET,
+    STATE_WORK_INTERRUPT,
+    STATE_WORK_START,
+    load_history,
+    log_files,
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILE = "history.pmh"
+
+_MAGIC = b"PMHIST\0\0"
+_FORMAT_VERSION = 1
+
+# (列名, 型, 長さ) 長さは行数（rows）または日数（days）
+COLUMNS = [
+    ("timestamp", "<i8", "rows"),
+    ("count", "<i4", "rows"),
+    ("day", "<i4", "rows"),
+    ("state", "u1", "rows"),
+    ("days", "<i4", "days"),
+]
+
+_ALIGNMENT = 8
+_HEADER = struct.Struct("<8sHHIQQ" + "Q" * len(COLUMNS))
+
+# 状態コードごとの (開始時刻, リセット時刻, 中断時刻, 状態) のうち時刻を入れる列と状態
+_ROW_LAYOUT = {
+    STATE_WORK_START: (1, "work"),
+    STATE_BREAK_START: (1, "break"),
+    STATE_RESET: (2, ""),
+    STATE_WORK_INTERRUPT: (3, "work"),
+    STATE_BREAK_INTERRUPT: (3, "break"),
+}
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+_HEADER_SIZE = _align(_HEADER.size)
+
+
+def export_history(log_dir=LOG_DIR, path=ARCHIVE_FILE):
+    """ログディレクトリを列指向のバイナリファイルに書き出す
+
+    (書き出した行数, 形式が不正で書き出さなかった行数) を返す。
+    """
+    history = load_history(log_dir)
+    lengths = {"rows": len(history["timestamp"]), "days": len(history["days"])}
+
+    offsets = []
+    offset = _HEADER_SIZE
+    for name, dtype, length in COLUMNS:
+        offsets.append(offset)
+        offset = _align(offset + lengths[length] * np.dtype(dtype).itemsize)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        len(COLUMNS),
+        0,
+        lengths["rows"],
+        lengths["days"],
+        *offsets,
+    )
+
+    with open(path, "wb") as f:
+        f.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for (name, dtype, length), start in zip(COLUMNS, offsets):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(np.ascontiguousarray(history[name], dtype=dtype).tobytes())
+        f.write(b"\0" * (offset - f.tell()))
+
+    return lengths["rows"], history["skipped"]
+
+
+def open_archive(path=ARCHIVE_FILE):
+    """バイナリファイルをメモリマップし、列ごとの配列を返す
+
+    配列はファイルの内容をコピーせずに参照する（読み取り専用）。
+    """
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(raw) < _HEADER_SIZE:
+        raise ValueError(f"履歴ファイルが短すぎます: {path}")
+
+    magic, version, columns, _, rows, days, *offsets = _HEADER.unpack(
+        bytes(raw[:_HEADER.size])
+    )
+    if magic != _MAGIC or version != _FORMAT_VERSION or columns != len(COLUMNS):
+        raise ValueError(f"履歴ファイルの形式が不正です: {path}")
+
+    lengths = {"rows": rows, "days": days}
+    arrays = {}
+    for (name, dtype, length), start in zip(COLUMNS, offsets):
+        end = start + lengths[length] * np.dtype(dtype).itemsize
+        if end > len(raw):
+            raise ValueError(f"履歴ファイルが途中で切れています: {path}")
+        arrays[name] = raw[start:end].view(dtype)
+    return arrays
+
+
+def _format_timestamps(timestamp):
+    """秒の配列を "YYYY-MM-DD HH:MM:SS" 形式の文字列の配列に変換"""
+    if timestamp.size == 0:
+        # 空の配列では np.char.replace が失敗するため
+        return np.empty(0, dtype="<U19")
+    text = np.datetime_as_string(timestamp.astype("datetime64[s]"), unit="s")
+    return np.char.replace(text, "T", " ")
+
+
+def import_history(path=ARCHIVE_FILE, log_dir=LOG_DIR):
+    """バイナリファイルから log_pomodoro と同じ形式の日別CSVを作成
+
+    既存のファイルは上書きしない。作成したファイル数を返す。
+    """
+    history = open_archive(path)
+    timestamps = _format_timestamps(history["timestamp"])
+    days = history["days"].astype(np.int64) * SECONDS_PER_DAY
+    dates = [text[:10] for text in _format_timestamps(days)]
+
+    files = [Path(log_file_for(date, log_dir)) for date in dates]
+    existing = [str(f) for f in files if f.exists()]
+    if existing:
+        raise FileExistsError(
+            f"ログファイルが既に存在します: {existing[0]} ほか{len(existing) - 1}件"
+        )
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+    # 行はファイルの日付順に並んでいるので、各日の範囲を二分探索で求める
+    starts = np.searchsorted(history["day"], history["days"], side="left")
+    ends = np.searchsorted(history["day"], history["days"], side="right")
+
+    for csv_file, start, end in zip(files, starts, ends):
+        with open(csv_file, mode="w", newline="", encoding="shift_jis") as file:
+            writer = csv.writer(file)
+            writer.writerow(LOG_HEADER)
+            for i in range(start, end):
+                text = str(timestamps[i])
+                column, timer_type = _ROW_LAYOUT[int(history["state"][i])]
+                count = int(history["count"][i])
+                row = [text, "", "", "", timer_type, "" if count == NO_COUNT else count]
+                row[column] = text[11:]
+                writer.writerow(row)
+
+    return len(files)
+
+
+def _read_rows(path):
+    with open(path, mode="r", newline="", encoding="shift_jis") as file:
+        return list(csv.reader(file))
+
+
+def verify_round_trip(path=ARCHIVE_FILE, log_dir=LOG_DIR):
+    """バイナリファイルから復元したログが元のログと一致するか確認
+
+    元のCSVと復元したCSVをファイルごとに1行ずつ比べる。
+    一致しないファイルの説明のリストを返す（一致すれば空）。
+    """
+    mismatched = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        import_history(path, temp_dir)
+        restored = {f.name: f for f in log_files(temp_dir)}
+
+        for original in log_files(log_dir):
+            copy = restored.pop(original.name, None)
+            if copy is None:
+                mismatched.append(f"{original.name}: 復元されていません")
+                continue
+            try:
+                expected = _read_rows(original)
+            except (OSError, ValueError) as e:
+                mismatched.append(f"{original.name}: 読み込めません ({e})")
+                continue
+            actual = _read_rows(copy)
+            if expected != actual:
+                line = next(
+                    (i for i, (a, b) in enumerate(zip(expected, actual), 1) if a != b),
+                    min(len(expected), len(actual)) + 1,
+                )
+                mismatched.append(
+                    f"{original.name}: {line}行目が一致しません"
+                    f"（元 {len(expected)}行, 復元 {len(actual)}行）"
+                )
+
+        mismatched += [f"{name}: 元のログにありません" for name in restored]
+    return mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ログ履歴を列指向のバイナリ形式で書き出し/読み込み")
+    parser.add_argument("command", choices=["export", "import", "verify"])
+    parser.add_argument("archive", nargs="?", default=ARCHIVE_FILE, help="バイナリファイル")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="ログディレクトリ")
+    parser.add_argument("--no-verify", action="store_true", help="書き出し後の往復確認を省略")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            rows, skipped = export_history(args.log_dir, args.archive)
+            print(f"{rows}行を {args.archive} に書き出しました")
+            if skipped:
+                print(f"形式が不正な{skipped}行は書き出していません", file=sys.stderr)
+            if args.no_verify:
+                return
+        elif args.command == "import":
+            files = import_history(args.archive, args.log_dir)
+            print(f"{files}個のログファイルを {args.log_dir} に作成しました")
+            return
+
+        mismatched = verify_round_trip(args.archive, args.log_dir)
+    except (OSError, ValueError) as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if mismatched:
+        print("往復確認に失敗:", file=sys.stderr)
+        for message in mismatched:
+            print(f"  {message}", file=sys.stderr)
+        sys.exit(1)
+    print("往復確認: 一致しました")
+
+
+if __name__ == "__main__":
+    main()
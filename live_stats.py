@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+from datetime import datetime, time, timedelta
+
+from daily_log import LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_NAME = "daily_summary.json"
+SUMMARY_FILE = f"{LOG_DIR}/{SUMMARY_NAME}"
+
+# 日ごとの集計の項目
+EMPTY_DAY = {
+    "focus_seconds": 0,   # 作業フェーズで計測した時間
+    "segments": 0,        # 作業区間の数（開始から完了/中断まで）
+    "completed": 0,       # 完了した作業フェーズ
+    "interruptions": 0,   # 中断された作業フェーズ
+}
+
+
+def _date_str(moment):
+    return moment.strftime("%Y-%m-%d")
+
+
+def _elapsed_seconds(start, end):
+    """start から end までの秒数
+
+    ログと同じく秒未満を切り捨てた時刻どうしで計算する。
+    """
+    elapsed = end.replace(microsecond=0) - start.replace(microsecond=0)
+    return max(0, int(elapsed.total_seconds()))
+
+
+def _week_start(moment):
+    """moment が含まれる週の月曜日"""
+    return moment.date() - timedelta(days=moment.weekday())
+
+
+class LiveStats:
+    """今日/今週の統計をフェーズのイベントごとに O(1) で更新する
+
+    日ごとの集計は SUMMARY_FILE に保存しておき、起動時はそこから
+    今週分の集計と連続日数を読み込むだけで、ログファイルは読まない。
+
+    日付をまたいだ作業区間は午前0時で2つの区間に分け、それぞれの日に
+    1区間として数える（完了/中断は後半の区間の日にだけ数える）。
+    build_summary も同じ規則で集計する。
+    """
+
+    def __init__(self, summary, now, path=SUMMARY_FILE):
+        """path が None の場合、集計は保存しない"""
+        self.path = path
+        self.days = summary.get("days", {})
+        self.streak_date = summary.get("streak_date")
+        self.streak_length = summary.get("streak_length", 0)
+        self.segment_start = None
+        self._open_day(now)
+
+    @classmethod
+    def load(cls, now, log_dir=LOG_DIR):
+        """保存された集計から統計を作成
+
+        集計ファイルが無いか壊れている場合は、ログ全体から作成して保存する。
+        作成できなかった場合は保存せず、次回の起動時に作り直す。
+        """
+        path = f"{log_dir}/{SUMMARY_NAME}"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f), now, path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"統計の読み込みに失敗: {e}")
+
+        summary = build_summary(now, log_dir)
+        if summary is None:
+            return cls({}, now, path=None)
+
+        stats = cls(summary, now, path)
+        stats.save()
+        return stats
+
+    def _open_day(self, now):
+        """now の日付を今日として集計を準備"""
+        self.date = _date_str(now)
+        self.today = self.days.setdefault(self.date, dict(EMPTY_DAY))
+
+        # 今週の合計は日付が変わった時だけ計算し直す
+        week_start = _week_start(now)
+        self.week_focus_seconds = sum(
+            day["focus_seconds"]
+            for date, day in self.days.items()
+            if datetime.strptime(date, "%Y-%m-%d").date() >= week_start
+        )
+
+    def _add_focus(self, seconds):
+        self.today["focus_seconds"] += seconds
+        self.week_focus_seconds += seconds
+
+    def phase_started(self, phase, when):
+        """フェーズの開始（再開を含む）"""
+        if phase == "work":
+            self.segment_start = when
+
+    def phase_ended(self, phase, when, completed):
+        """フェーズの完了または中断"""
+        if phase != "work" or self.segment_start is None:
+            return
+
+        self._add_focus(_elapsed_seconds(self.segment_start, when))
+        self.segment_start = None
+        self.today["segments"] += 1
+        if completed:
+            self.today["completed"] += 1
+            self._extend_streak()
+        else:
+            self.today["interruptions"] += 1
+        self.save()
+
+    def _extend_streak(self):
+        """今日を連続日数に含める"""
+        if self.streak_date == self.date:
+            return
+        yesterday = _date_str(datetime.strptime(self.date, "%Y-%m-%d") - timedelta(days=1))
+        self.streak_length = self.streak_length + 1 if self.streak_date == yesterday else 1
+        self.streak_date = self.date
+
+    def day_rollover(self, now):
+        """日付が変わった時の処理
+
+        作業中の区間は午前0時で区切り、前半を前日の1区間として数える。
+        """
+        midnight = datetime.combine(now.date(), time.min)
+        if self.segment_start is not None:
+            self._add_focus(_elapsed_seconds(self.segment_start, midnight))
+            self.today["segments"] += 1
+            self.segment_start = midnight
+
+        self._open_day(now)
+        self.save()
+
+    def current_streak(self):
+        """今日または昨日まで続いている連続日数"""
+        if self.streak_date is None:
+            return 0
+        last = datetime.strptime(self.streak_date, "%Y-%m-%d").date()
+        today = datetime.strptime(self.date, "%Y-%m-%d").date()
+        return self.streak_length if (today - last).days <= 1 else 0
+
+    def average_session_seconds(self):
+        """今日の作業区間の平均の長さ"""
+        if self.today["segments"] == 0:
+            return 0
+        return self.today["focus_seconds"] // self.today["segments"]
+
+    def save(self):
+        """今週分の集計と連続日数を保存"""
+        if self.path is None:
+            return
+        week_start = _week_start(datetime.strptime(self.date, "%Y-%m-%d"))
+        self.days = {
+            date: day for date, day in self.days.items()
+            if datetime.strptime(date, "%Y-%m-%d").date() >= week_start
+        }
+        summary = {
+            "days": self.days,
+            "streak_date": self.streak_date,
+            "streak_length": self.streak_length,
+        }
+
+        temp_file = f"{self.path}.tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False)
+            os.replace(temp_file, self.path)
+        except Exception as e:
+            logger.error(f"統計の保存に失敗: {e}")
+
+
+def build_summary(now, log_dir=LOG_DIR):
+    """ログ全体から今週分の集計と連続日数を作成（集計ファイルが無い時のみ）
+
+    日付をまたいだ作業区間は、新しい日のログの午前0時の開始行で
+    区切られているので、その行で終わる区間も1区間として数える。
+    NumPy が無く作成できない場合は None を返す。
+    """
+    try:
+        import numpy as np
+
+        from history import (
+            SECONDS_PER_DAY,
+            STATE_BREAK_START,
+            STATE_RESET,
+            STATE_WORK_INTERRUPT,
+            STATE_WORK_START,
+            load_history,
+        )
+    except ImportError as e:
+        logger.warning(f"過去のログから統計を作成できません: {e}")
+        return None
+
+    history = load_history(log_dir)
+    order = np.argsort(history["timestamp"], kind="stable")
+    timestamp = history["timestamp"][order]
+    state = history["state"][order]
+
+    is_work = state[:-1] == STATE_WORK_START
+    following = state[1:]
+    completed = is_work & (following == STATE_BREAK_START)
+    interrupted = is_work & (
+        (following == STATE_WORK_INTERRUPT) | (following == STATE_RESET)
+    )
+    carried = is_work & (following == STATE_WORK_START) & (
+        timestamp[1:] % SECONDS_PER_DAY == 0
+    )
+    ended = completed | interrupted | carried
+    start = timestamp[:-1]
+    elapsed = np.diff(timestamp)
+    day = start // SECONDS_PER_DAY
+
+    # 今週の各日の集計
+    epoch = datetime(1970, 1, 1)
+    week_start = (datetime.combine(_week_start(now), time.min) - epoch).days
+    today = (datetime.combine(now.date(), time.min) - epoch).days
+    days = {}
+    for offset in range(today - week_start + 1):
+        on_day = day == week_start + offset
+        days[_date_str(epoch + timedelta(days=week_start + offset))] = {
+            "focus_seconds": int(elapsed[on_day & ended].sum()),
+            "segments": int(np.count_nonzero(on_day & ended)),
+            "completed": int(np.count_nonzero(on_day & completed)),
+            "interruptions": int(np.count_nonzero(on_day & interrupted)),
+        }
+
+    # 最後に作業を完了した日で終わる連続日数
+    active = np.unique(day[completed])
+    summary = {"days": days}
+    if active.size:
+        gaps = np.flatnonzero(np.diff(active) != 1)
+        run_start = active[gaps[-1] + 1] if gaps.size else active[0]
+        summary["streak_date"] = _date_str(epoch + timedelta(days=int(active[-1])))
+        summary["streak_length"] = int(active[-1] - run_start + 1)
+    return summary
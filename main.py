@@ -1,50 +1,80 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import csv
-from datetime import datetime
-import os
+from datetime import datetime, time
 import logging
-from pathlib import Path
 
-from config import load_config, save_config
+from config import CONFIG_FILE, load_config, save_config
+from daily_log import DailyLog
 from sound_manager import SoundManager
 from timer_settings import TimerSettingsWindow
+from count_dialog import PomodoroCountDialog
+from startup_snapshot import load_snapshot, save_snapshot
+from live_stats import LiveStats
 
 # ロギングの設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 日付切り替えを確認する最大間隔（ミリ秒）
+ROLLOVER_CHECK_MS = 10 * 60 * 1000
+
 class PomodoroTimer:
     def __init__(self, master):
         self.master = master
         master.title("Pomodoro Timer")
         
+        # 前回終了時のスナップショットがあれば、設定の読み込みとログの走査を省略
+        # （フェーズは終了時のものから再開する）
+        snapshot = load_snapshot()
+        if snapshot is not None and snapshot["date"] != datetime.now().strftime("%Y-%m-%d"):
+            snapshot = None
+        
         # 設定を読み込み
-        self.config = load_config()
+        self.config = snapshot["config"] if snapshot else load_config()
         
         # サウンドマネージャーを初期化
-        self.sound_manager = SoundManager(self.config)
+        self.sound_manager = SoundManager(self.config, create_dirs=snapshot is None)
         
         # タイマーの状態を初期化
         self.timer_running = False
+        self.countdown_after_id = None
         self.work_seconds = self.config["timer"]["work_time"] * 60
         self.break_seconds = self.config["timer"]["break_time"] * 60
-        self.current_timer = "work"
+        self.current_timer = snapshot["current_timer"] if snapshot else "work"
         
-        # ログディレクトリを作成
-        Path("log").mkdir(exist_ok=True)
-        
-        # CSVファイルの設定
-        self.start_date = datetime.now().strftime("%Y-%m-%d")
-        self.csv_file = f"log/pomodoro_log_{self.start_date}.csv"
-        self.ensure_csv_file()
+        # 日ごとのログファイルを設定
+        self.daily_log = DailyLog(create=snapshot is None)
+        self.rollover_after_id = None
         
         # ポモドーロカウントを初期化
-        self.pomodoro_count = self.get_today_pomodoro_count()
+        if snapshot:
+            self.pomodoro_count = snapshot["pomodoro_count"]
+        else:
+            self.pomodoro_count = self.get_today_pomodoro_count()
         self.work_count = self.pomodoro_count + 1
-        self.break_count = self.pomodoro_count + 1
+        # 休憩中の場合、その休憩は終了したポモドーロに属する
+        self.break_count = self.pomodoro_count + (self.current_timer == "work")
+        
+        # 統計は保存済みの日ごとの集計から読み込む
+        self.live_stats = LiveStats.load(datetime.now(), self.daily_log.log_dir)
+        
+        # ダイアログは初回表示時に作成する
+        self.settings_window = None
+        self.count_dialog = None
         
         self.setup_ui()
+        if self.current_timer == "break":
+            self.update_timer_label(self.break_seconds)
+            self.update_timer_color()
+        
+        # 音量制御はウィンドウの表示後に初期化
+        self.master.after_idle(self.sound_manager.init_volume_control)
+        
+        # 日付切り替えを予約
+        self.schedule_day_rollover()
+        
+        # 終了時にスナップショットを保存
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_ui(self):
         """UIの初期化"""
@@ -84,6 +114,14 @@ class PomodoroTimer:
             width=6
         ).pack(side=tk.LEFT, padx=5)
         
+        # 統計パネル
+        stats_frame = ttk.LabelFrame(self.master, text="統計", padding="5")
+        stats_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.stats_label = ttk.Label(stats_frame, justify=tk.LEFT)
+        self.stats_label.pack(fill=tk.X)
+        self.update_stats_label()
+        
         # メインボタンフレーム
         button_frame = ttk.Frame(self.master)
         button_frame.pack(pady=5)
@@ -157,22 +195,50 @@ class PomodoroTimer:
         # ウィンドウ位置の変更を監視
         self.master.bind("<Configure>", self.on_window_configure)
         
-    def ensure_csv_file(self):
-        """CSVファイルが存在しない場合、新規作成"""
-        if not os.path.exists(self.csv_file):
-            with open(self.csv_file, mode="w", newline="", encoding="shift_jis") as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    "タイムスタンプ",
-                    "開始時刻",
-                    "リセット時刻",
-                    "中断時刻",
-                    "状態",
-                    "カウント",
-                ])
+    def schedule_day_rollover(self):
+        """次の午前0時に日付切り替えを予約
+
+        スリープや時計の変更でずれても遅れが小さく済むよう、
+        待ち時間は最大でも ROLLOVER_CHECK_MS に抑える。
+        """
+        delay_ms = int(self.daily_log.seconds_until_rollover() * 1000) + 1
+        self.rollover_after_id = self.master.after(
+            min(delay_ms, ROLLOVER_CHECK_MS), self.on_day_rollover
+        )
+    
+    def on_day_rollover(self):
+        """予約した日付切り替えの確認"""
+        self.check_day_rollover()
+        self.schedule_day_rollover()
+    
+    def check_day_rollover(self):
+        """午前0時を過ぎていれば新しい日のログとカウントに切り替え
+
+        スリープから復帰した直後は、予約した切り替えより先にカウントダウンが
+        実行されることがあるため、フェーズの変化時にも呼び出す。
+        """
+        now = datetime.now()
+        if not self.daily_log.rollover(now):
+            return
+        
+        # 新しい日のカウントはファイルを読まずに0から始める
+        self.pomodoro_count = 0
+        self.work_count = 1
+        # 休憩中の場合、その休憩は前日のポモドーロに属する
+        self.break_count = 0 if self.current_timer == "break" else 1
+        self.update_pomodoro_label()
+        
+        self.live_stats.day_rollover(now)
+        self.update_stats_label()
+        
+        # 進行中のセッションは午前0時に開始したものとして新しい日のログに引き継ぐ
+        # （元の開始時刻は self.start_time に残る）
+        if self.timer_running:
+            self.log_pomodoro(start_time=datetime.combine(now.date(), time.min))
     
     def toggle_timer(self):
         """タイマーの開始/停止を切り替え"""
+        self.check_day_rollover()
         if not self.timer_running:
             self.timer_running = True
             self.start_button.config(text="一時停止")
@@ -181,7 +247,9 @@ class PomodoroTimer:
             # タイマー開始時刻を記録
             self.start_time = datetime.now()
             self.log_pomodoro(start_time=self.start_time)
+            self.live_stats.phase_started(self.current_timer, self.start_time)
             
+            self.cancel_countdown()
             self.countdown(
                 self.work_seconds
                 if self.current_timer == "work"
@@ -189,22 +257,32 @@ class PomodoroTimer:
             )
         else:
             self.timer_running = False
+            self.cancel_countdown()
             self.start_button.config(text="開始")
             
             # タイマー中断時刻を記録
             interruption_time = datetime.now()
             self.log_pomodoro(interruption_time=interruption_time)
+            self.live_stats.phase_ended(self.current_timer, interruption_time, completed=False)
+            self.update_stats_label()
     
     def reset_timer(self):
         """タイマーをリセット"""
+        self.check_day_rollover()
+        
+        # 実行中のフェーズは中断として集計
+        reset_time = datetime.now()
+        self.live_stats.phase_ended(self.current_timer, reset_time, completed=False)
+        self.update_stats_label()
+        
         self.timer_running = False
+        self.cancel_countdown()
         self.start_button.config(text="開始")
         self.current_timer = "work"
         self.work_seconds = self.config["timer"]["work_time"] * 60
         self.break_seconds = self.config["timer"]["break_time"] * 60
         
         # リセット時刻を記録
-        reset_time = datetime.now()
         self.log_pomodoro(reset_time=reset_time)
         
         self.update_timer_label(self.work_seconds)
@@ -227,9 +305,10 @@ class PomodoroTimer:
             else:
                 self.break_seconds = timer_seconds - 1
                 
-            self.master.after(1000, self.countdown, timer_seconds - 1)
+            self.countdown_after_id = self.master.after(1000, self.countdown, timer_seconds - 1)
             
         elif timer_seconds == 0:
+            self.check_day_rollover()
             self.sound_manager.play_start_sound()
             
             if self.current_timer == "work":
@@ -244,6 +323,8 @@ class PomodoroTimer:
                 # タイマー開始時刻を記録
                 self.start_time = datetime.now()
                 self.log_pomodoro(start_time=self.start_time)
+                self.live_stats.phase_ended("work", self.start_time, completed=True)
+                self.update_stats_label()
                 
                 self.countdown(self.break_seconds)
             else:
@@ -254,12 +335,23 @@ class PomodoroTimer:
                 # タイマー開始時刻を記録
                 self.start_time = datetime.now()
                 self.log_pomodoro(start_time=self.start_time)
+                self.live_stats.phase_started("work", self.start_time)
                 
                 self.countdown(self.work_seconds)
             
             # タイマーの文字色を更新
             self.update_timer_color()
     
+    def cancel_countdown(self):
+        """保留中のカウントダウンを取り消す
+
+        一時停止やリセットの直後に再開しても、カウントダウンが
+        二重に進まないようにする。
+        """
+        if self.countdown_after_id is not None:
+            self.master.after_cancel(self.countdown_after_id)
+            self.countdown_after_id = None
+    
     def update_timer_label(self, minutes, seconds=None):
         """タイマーのラベルを更新"""
         if seconds is None:
@@ -277,61 +369,31 @@ class PomodoroTimer:
         """ポモドーロのループ回数のラベルを更新"""
         self.pomodoro_label.config(text=f"{self.pomodoro_count}ﾎﾟﾓﾄﾞｰﾛ終了")
         
+    def update_stats_label(self):
+        """統計パネルを更新（フェーズの変化時のみ）"""
+        stats = self.live_stats
+        self.stats_label.config(
+            text=(
+                f"今日 {stats.today['focus_seconds'] // 60}分 / "
+                f"今週 {stats.week_focus_seconds // 60}分\n"
+                f"中断 {stats.today['interruptions']}回 / "
+                f"連続 {stats.current_streak()}日 / "
+                f"平均 {stats.average_session_seconds() // 60}分"
+            )
+        )
+        
     def edit_pomodoro_count(self):
         """ポモドーロカウントを編集"""
-        dialog = tk.Toplevel(self.master)
-        dialog.title("ポモドーロカウント編集")
-        dialog.geometry("250x120")
-        dialog.resizable(False, False)
-        
-        # メインフレーム
-        main_frame = ttk.Frame(dialog, padding="10")
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # カウント入力
-        count_frame = ttk.Frame(main_frame)
-        count_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(count_frame, text="カウント:").pack(side=tk.LEFT)
-        count_var = tk.StringVar(value=str(self.pomodoro_count))
-        count_entry = ttk.Entry(count_frame, textvariable=count_var, width=10)
-        count_entry.pack(side=tk.LEFT, padx=5)
-        
-        # ボタンフレーム
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill=tk.X, pady=10)
-        
-        def save_count():
-            try:
-                new_count = int(count_var.get())
-                if new_count < 0:
-                    raise ValueError("カウントは0以上の値を入力してください")
-                    
-                self.pomodoro_count = new_count
-                self.work_count = new_count + 1
-                self.break_count = new_count + 1
-                self.update_pomodoro_label()
-                dialog.destroy()
-                
-            except ValueError as e:
-                tk.messagebox.showerror("エラー", str(e))
-        
-        ttk.Button(
-            button_frame,
-            text="キャンセル",
-            command=dialog.destroy
-        ).pack(side=tk.RIGHT)
-        
-        ttk.Button(
-            button_frame,
-            text="保存",
-            command=save_count
-        ).pack(side=tk.RIGHT, padx=5)
-        
-        # モーダルウィンドウとして表示
-        dialog.transient(self.master)
-        dialog.grab_set()
-        count_entry.focus()
+        if self.count_dialog is None:
+            self.count_dialog = PomodoroCountDialog(self.master, self.set_pomodoro_count)
+        self.count_dialog.show(self.pomodoro_count)
+    
+    def set_pomodoro_count(self, new_count):
+        """ポモドーロカウントを設定"""
+        self.pomodoro_count = new_count
+        self.work_count = new_count + 1
+        self.break_count = new_count + 1
+        self.update_pomodoro_label()
         
     def reset_pomodoro_count(self):
         """ポモドーロカウントをリセット"""
@@ -370,7 +432,11 @@ class PomodoroTimer:
     
     def show_settings(self):
         """設定ウィンドウを表示"""
-        TimerSettingsWindow(self.master, self.config, self.apply_settings)
+        if self.settings_window is None:
+            self.settings_window = TimerSettingsWindow(
+                self.master, self.config, self.apply_settings
+            )
+        self.settings_window.show(self.config)
     
     def apply_settings(self, new_config):
         """新しい設定を適用"""
@@ -392,6 +458,21 @@ class PomodoroTimer:
             self.config["window"]["size"] = {"width": width, "height": height}
             save_config(self.config)
     
+    def on_close(self):
+        """ウィンドウを閉じる時の処理"""
+        save_snapshot(
+            {
+                "date": self.daily_log.date,
+                "config": self.config,
+                # 起動時にログから求める値と同じものを保存する
+                # （手動で編集したカウントはログに残らないため含めない）
+                "pomodoro_count": self.daily_log.read_max_count(),
+                "current_timer": self.current_timer,
+            },
+            [CONFIG_FILE, self.daily_log.csv_file] + self.sound_manager.sound_files(),
+        )
+        self.master.destroy()
+    
     def log_pomodoro(self, start_time=None, reset_time=None, interruption_time=None):
         """ポモドーロの状態をログに記録"""
         row = []
@@ -435,33 +516,11 @@ class PomodoroTimer:
                 count,
             ]
         
-        try:
-            with open(self.csv_file, mode="a", newline="", encoding="shift_jis") as file:
-                writer = csv.writer(file)
-                writer.writerow(row)
-        except Exception as e:
-            logger.error(f"ログの書き込みに失敗: {e}")
+        self.daily_log.write(row)
     
     def get_today_pomodoro_count(self):
         """当日のポモドーロ回数を取得"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        pomodoro_count = 0
-        
-        try:
-            with open(self.csv_file, mode="r", encoding="shift_jis") as file:
-                reader = csv.reader(file)
-                next(reader, None)  # ヘッダーをスキップ
-                for row in reversed(list(reader)):
-                    if row[0].startswith(today):
-                        try:
-                            count = int(row[5]) if len(row) > 5 and row[5].strip() else 0
-                            pomodoro_count = max(pomodoro_count, count)
-                        except ValueError:
-                            logger.warning(f"無効なカウント値を検出: {row[5]}")
-        except Exception as e:
-            logger.error(f"ログの読み込みに失敗: {e}")
-        
-        return pomodoro_count
+        return self.daily_log.read_max_count()
 
 def main():
     root = tk.Tk()
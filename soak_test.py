@@ -0,0 +1,441 @@
+"""長時間稼働のソークテスト
+
+仮想時計でタイマーを駆動し、開始/一時停止/リセット/設定変更/ウィンドウの
+ドラッグなどの操作を数か月分シミュレートする。シミュレート上の1日ごとに
+メモリ使用量、開いているファイルハンドル数、保留中の after コールバックの最大数、
+Tkウィジェット数、操作ごとの処理時間を記録し、いずれかが増え続けて
+いれば失敗とする。
+
+    python soak_test.py --days 90
+
+ログや設定ファイルは一時ディレクトリに書き込まれる。
+"""
+import argparse
+import collections
+import heapq
+import importlib
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+import types
+from datetime import datetime, timedelta
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# 日付を差し替えるアプリケーションのモジュール
+APP_MODULES = ["main", "daily_log"]
+
+# sound_manager が読み込む Windows 専用のモジュールと、その中で参照する名前
+SOUND_MODULES = {
+    "winsound": ["Beep", "PlaySound", "SND_FILENAME", "SND_ASYNC"],
+    "comtypes": ["CLSCTX_ALL"],
+    "pycaw": [],
+    "pycaw.pycaw": ["AudioUtilities", "IAudioEndpointVolume"],
+}
+
+# 指標ごとの許容幅（最初の期間の最大値に対する相対値, 絶対値）
+TOLERANCES = {
+    "rss_mb": (0.10, 8.0),
+    "open_handles": (0.0, 2),
+    "pending_after": (0.0, 1),
+    "tk_after_info": (0.0, 1),
+    "widgets": (0.0, 0),
+}
+# 処理時間（p95, ミリ秒）はディスクの fsync などでばらつくため中央値で比べる
+LATENCY_TOLERANCE = (1.0, 2.0)
+
+
+class VirtualClock:
+    """Tk の after を置き換える仮想時計"""
+
+    def __init__(self, start):
+        self.now = start
+        self._queue = []
+        self._sequence = itertools.count()
+        self._pending = {}
+
+    def after(self, ms, func=None, *args):
+        """ms ミリ秒後（仮想時間）に func を呼び出すよう予約"""
+        sequence = next(self._sequence)
+        after_id = f"virtual#{sequence}"
+        due = self.now + timedelta(milliseconds=ms)
+        heapq.heappush(self._queue, (due, sequence, after_id, func, args))
+        self._pending[after_id] = func.__name__
+        return after_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        self._pending.pop(after_id, None)
+
+    def pending(self):
+        """保留中のコールバック数"""
+        return len(self._pending)
+
+    def duplicated(self):
+        """同じ関数が複数保留されているものの {関数名: 数}"""
+        counts = collections.Counter(self._pending.values())
+        return {name: n for name, n in counts.items() if n > 1}
+
+    def run_until(self, until, on_callback=None):
+        """until までに期限が来るコールバックを順に実行"""
+        while self._queue and self._queue[0][0] <= until:
+            due, _, after_id, func, args = heapq.heappop(self._queue)
+            if after_id not in self._pending:
+                continue
+            del self._pending[after_id]
+            self.now = due
+            started = time.perf_counter()
+            func(*args)
+            if on_callback is not None:
+                on_callback(func.__name__, time.perf_counter() - started)
+        self.now = until
+
+
+def make_virtual_datetime(clock):
+    """now() が仮想時計の時刻を返す datetime のサブクラスを作成"""
+
+    class VirtualDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.now
+
+    return VirtualDatetime
+
+
+class QuietSoundManager:
+    """音を鳴らさずに呼び出し回数だけを数えるサウンドマネージャー"""
+
+    def __init__(self, config, create_dirs=True):
+        self.config = config
+        self.volume = config["sound"]["volume"]
+        self.use_beep = config["sound"]["use_beep"]
+        self.played = 0
+
+    def init_volume_control(self):
+        pass
+
+    def sound_files(self):
+        return []
+
+    def play_start_sound(self):
+        self.played += 1
+
+    def play_reminder_sound(self):
+        self.played += 1
+
+    def toggle_sound_mode(self):
+        self.use_beep = not self.use_beep
+        self.config["sound"]["use_beep"] = self.use_beep
+        return self.use_beep
+
+    def set_volume(self, volume):
+        self.volume = max(0, min(100, volume))
+        self.config["sound"]["volume"] = self.volume
+
+
+def stub_sound_modules():
+    """読み込めないサウンド関連のモジュールを空のモジュールで置き換える
+
+    音は QuietSoundManager が代わりに扱うため、中身は使われない。
+    Windows 以外でも main を読み込めるようにする。
+    """
+    for name, attributes in SOUND_MODULES.items():
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            module = types.ModuleType(name)
+            for attribute in attributes:
+                setattr(module, attribute, None)
+            sys.modules[name] = module
+
+
+def rss_mb():
+    """現在のメモリ使用量（MB）"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def open_handles():
+    """開いているファイルハンドル数"""
+    if psutil is not None:
+        process = psutil.Process()
+        if hasattr(process, "num_handles"):
+            return process.num_handles()
+        return process.num_fds()
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def count_widgets(widget):
+    """widget 以下のウィジェット数"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class SoakTest:
+    def __init__(self, days, start):
+        self.days = days
+        self.clock = VirtualClock(start)
+        self.samples = []
+        self.latencies = {}
+        self.errors = []
+        self.reported_duplicates = set()
+        self.peak_pending = 0
+
+        stub_sound_modules()
+        import main
+        self.main = main
+        logging.getLogger().setLevel(logging.WARNING)
+
+        # 日付と after を仮想時計に差し替え
+        virtual_datetime = make_virtual_datetime(self.clock)
+        for name in APP_MODULES:
+            module = sys.modules.get(name)
+            if module is not None and getattr(module, "datetime", None) is datetime:
+                module.datetime = virtual_datetime
+        main.SoundManager = QuietSoundManager
+
+        self.root = tk.Tk()
+        self.root.after = self.clock.after
+        self.root.after_idle = self.clock.after_idle
+        self.root.after_cancel = self.clock.after_cancel
+        try:
+            self.app = main.PomodoroTimer(self.root)
+            self.root.update()
+        except Exception:
+            self.root.destroy()
+            raise
+
+    def record(self, name, seconds):
+        self.latencies.setdefault(name, []).append(seconds * 1000)
+
+    def run_until(self, until):
+        """仮想時間を進めつつ、1分ごとにTkのイベントを処理"""
+        while self.clock.now < until:
+            step = min(until, self.clock.now + timedelta(minutes=1))
+            self.clock.run_until(step, self.record)
+            self.root.update()
+            self.check_after_chains()
+
+    def operate(self, at, name, action):
+        """指定時刻に操作を実行し、処理時間を記録"""
+        self.run_until(at)
+        started = time.perf_counter()
+        action()
+        self.root.update()
+        self.record(name, time.perf_counter() - started)
+        self.check_after_chains()
+
+    def check_after_chains(self):
+        """保留中の after の最大数を記録し、同じ連鎖の重複を検出"""
+        self.peak_pending = max(self.peak_pending, self.clock.pending())
+        for name, count in self.clock.duplicated().items():
+            # 同じ日の同じ重複は最初の1回だけ報告
+            key = (self.clock.now.date(), name)
+            if key not in self.reported_duplicates:
+                self.reported_duplicates.add(key)
+                self.errors.append(
+                    f"{self.clock.now:%Y-%m-%d %H:%M:%S}: {name} の after が{count}個保留されています"
+                )
+
+    def drag_window(self):
+        """ウィンドウを少しずつ移動"""
+        x = self.root.winfo_x()
+        y = self.root.winfo_y()
+        for dx in (5, 5, -5, -5):
+            x += dx
+            self.root.geometry(f"+{x}+{y}")
+            self.root.update()
+
+    def change_settings(self, work_time):
+        """設定ウィンドウを開いて作業時間を変更"""
+        self.app.show_settings()
+        self.root.update()
+        self.app.settings_window.work_time.set(str(work_time))
+        self.app.settings_window.save_settings()
+
+    def edit_count(self):
+        """カウント編集ダイアログを開いて同じ値で保存"""
+        self.app.edit_pomodoro_count()
+        self.root.update()
+        self.app.count_dialog.save_count()
+
+    def pause(self):
+        if self.app.timer_running:
+            self.app.toggle_timer()
+
+    def resume(self):
+        if not self.app.timer_running:
+            self.app.toggle_timer()
+
+    def simulate_day(self, index):
+        """1日分の操作をシミュレート"""
+        day = datetime.combine(self.clock.now.date(), datetime.min.time())
+        at = lambda hours, minutes=0, ms=0: day + timedelta(
+            hours=hours, minutes=minutes, milliseconds=ms
+        )
+        keep_running = index % 7 == 6
+
+        self.operate(at(8, 55), "drag", self.drag_window)
+        self.operate(at(9), "start", self.resume)
+        self.operate(at(10, 10), "pause", self.pause)
+        self.operate(at(10, 15), "resume", self.resume)
+        # 前の countdown が保留中のうちに再開して、after の連鎖が増えないか確認
+        self.operate(at(11), "pause", self.pause)
+        self.operate(at(11, 0, 400), "resume", self.resume)
+        self.operate(at(11, 30), "reset", self.app.reset_timer)
+        self.operate(at(11, 30, 300), "start", self.resume)
+        self.operate(at(12), "reset", self.app.reset_timer)
+        self.operate(at(12, 30), "settings", lambda: self.change_settings(25 - index % 2))
+        self.operate(at(12, 31), "edit_count", self.edit_count)
+        self.operate(at(13), "start", self.resume)
+        if not keep_running:
+            self.operate(at(18), "pause", self.pause)
+
+        # 一部の日はタイマーを動かしたまま日付をまたぐ
+        self.run_until(at(24, 1))
+        self.check_rollover()
+        self.run_until(at(32, 50))
+        self.sample(index)
+
+    def check_rollover(self):
+        expected = self.clock.now.strftime("%Y-%m-%d")
+        if self.app.daily_log.date != expected:
+            self.errors.append(f"{expected}: ログファイルが切り替わっていない ({self.app.daily_log.csv_file})")
+
+    def sample(self, index):
+        """1日の終わりに指標を記録"""
+        sample = {
+            "day": index,
+            "rss_mb": rss_mb(),
+            "open_handles": open_handles(),
+            "pending_after": self.peak_pending,
+            "tk_after_info": len(self.root.tk.splitlist(self.root.tk.call("after", "info"))),
+            "widgets": count_widgets(self.root),
+            "latency": {
+                name: percentile(values, 0.95)
+                for name, values in self.latencies.items()
+            },
+        }
+        self.latencies = {}
+        self.peak_pending = 0
+        self.samples.append(sample)
+        return sample
+
+    def run(self, report_every=10):
+        for index in range(self.days):
+            self.simulate_day(index)
+            if (index + 1) % report_every == 0 or index + 1 == self.days:
+                sample = self.samples[-1]
+                print(
+                    f"{index + 1:4d}日目 {self.clock.now:%Y-%m-%d} "
+                    f"RSS={sample['rss_mb'] or 0:.1f}MB "
+                    f"ハンドル={sample['open_handles']} "
+                    f"after={sample['pending_after']}/{sample['tk_after_info']} "
+                    f"ウィジェット={sample['widgets']}"
+                )
+        return self.check_bounded()
+
+    def close(self):
+        self.root.destroy()
+
+    def check_bounded(self):
+        """最初と最後の期間を比べて、増え続けている指標がないか確認"""
+        # 初日はウィンドウやダイアログの初回作成を含むため除外
+        samples = self.samples[1:] or self.samples
+        window = max(1, len(samples) // 4)
+        first, last = samples[:window], samples[-window:]
+
+        failures = list(self.errors)
+        for name, (relative, absolute) in TOLERANCES.items():
+            failures += self._compare(
+                name,
+                [s[name] for s in first],
+                [s[name] for s in last],
+                relative,
+                absolute,
+                max,
+            )
+
+        for name in sorted({n for s in samples for n in s["latency"]}):
+            failures += self._compare(
+                f"latency[{name}]",
+                [s["latency"][name] for s in first if name in s["latency"]],
+                [s["latency"][name] for s in last if name in s["latency"]],
+                *LATENCY_TOLERANCE,
+                lambda values: percentile(values, 0.5),
+            )
+        return failures
+
+    @staticmethod
+    def _compare(name, first, last, relative, absolute, aggregate):
+        first = [v for v in first if v is not None]
+        last = [v for v in last if v is not None]
+        if not first or not last:
+            logger.warning(f"{name} を計測できないため確認を省略")
+            return []
+
+        before = aggregate(first)
+        after = aggregate(last)
+        limit = before * (1 + relative) + absolute
+        if after > limit:
+            return [f"{name}: {before:.2f} -> {after:.2f}（上限 {limit:.2f}）"]
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="タイマーを長期間シミュレートして資源の増加を確認")
+    parser.add_argument("--days", type=int, default=90, help="シミュレートする日数")
+    parser.add_argument("--start", default="2024-01-01", help="開始日 (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    source_dir = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # 設定とログを一時ディレクトリに書き込む
+        os.chdir(work_dir)
+        started = time.perf_counter()
+        soak = None
+        try:
+            soak = SoakTest(args.days, start)
+            failures = soak.run()
+        finally:
+            # 一時ディレクトリを削除できるよう、先に Tk を破棄して元の場所に戻る
+            if soak is not None:
+                soak.close()
+            os.chdir(source_dir)
+
+    print(f"{args.days}日分を{time.perf_counter() - started:.1f}秒でシミュレートしました")
+    if failures:
+        print("失敗:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("成功: 増え続けている指標はありません")
+
+
+if __name__ == "__main__":
+    main()
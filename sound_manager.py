@@ -10,20 +10,28 @@ logger = logging.getLogger(__name__)
 
 
 class SoundManager:
-    def __init__(self, config):
+    def __init__(self, config, create_dirs=True):
         self.config = config
         self.sound_enabled = True
         self.volume = config["sound"]["volume"]
         self.use_beep = config["sound"]["use_beep"]
 
         # 必要なディレクトリを作成
-        Path("sounds").mkdir(exist_ok=True)
+        if create_dirs:
+            Path("sounds").mkdir(exist_ok=True)
 
         # サウンドファイルのパス
         self.start_sound = "sounds/startBell.wav"
         self.reminder_sound = "sounds/bubble.wav"
 
-        # Windowsのオーディオデバイスを取得
+        # 音量制御は init_volume_control() で初期化する
+        self.volume_interface = None
+
+    def init_volume_control(self):
+        """Windowsのオーディオデバイスを取得して音量制御を初期化
+
+        時間がかかるため、ウィンドウの表示後に呼び出す。
+        """
         try:
             devices = AudioUtilities.GetSpeakers()
             interface = devices.Activate(
@@ -37,6 +45,10 @@ class SoundManager:
             logger.error(f"音量制御の初期化に失敗: {e}")
             self.volume_interface = None
 
+    def sound_files(self):
+        """使用するサウンドファイルのパス"""
+        return [self.start_sound, self.reminder_sound]
+
     def play_start_sound(self):
         """開始/終了時の音を再生"""
         if not self.sound_enabled:
@@ -0,0 +1,95 @@
+import logging
+import marshal
+import os
+import struct
+import zlib
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "startup.snapshot"
+
+# ヘッダー: マジック, 形式のバージョン, marshal のバージョン, 本体の長さ, CRC32
+_MAGIC = b"PMSNAP"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<6sHHII")
+
+
+def file_signature(path):
+    """ファイルの (パス, 更新時刻, サイズ)。存在しない場合は -1"""
+    try:
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return (path, -1, -1)
+
+
+def save_snapshot(state, watched_files, path=SNAPSHOT_FILE):
+    """起動時の状態をバイナリ形式で保存
+
+    watched_files の更新時刻とサイズも記録し、次回起動時に
+    いずれかが変わっていればスナップショットを使わない。
+    """
+    payload = marshal.dumps({
+        "state": state,
+        "files": [file_signature(p) for p in watched_files],
+    })
+    header = _HEADER.pack(
+        _MAGIC, _FORMAT_VERSION, marshal.version, len(payload), zlib.crc32(payload)
+    )
+
+    temp_file = f"{path}.tmp"
+    try:
+        with open(temp_file, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(temp_file, path)
+        return True
+    except Exception as e:
+        logger.error(f"スナップショットの保存に失敗: {e}")
+        return False
+    finally:
+        if os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except Exception as e:
+                logger.warning(f"一時ファイルの削除に失敗: {e}")
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """スナップショットを読み込み、有効であれば保存時の状態を返す
+
+    ファイルが無い、壊れている、または記録したファイルが変更されて
+    いる場合は None を返す。
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"スナップショットの読み込みに失敗: {e}")
+        return None
+
+    try:
+        magic, format_version, marshal_version, length, crc = _HEADER.unpack_from(data)
+        payload = data[_HEADER.size:]
+        if (
+            magic != _MAGIC
+            or format_version != _FORMAT_VERSION
+            or marshal_version != marshal.version
+            or length != len(payload)
+            or crc != zlib.crc32(payload)
+        ):
+            logger.info("スナップショットの形式が一致しないため使用しません")
+            return None
+        snapshot = marshal.loads(payload)
+    except Exception as e:
+        logger.warning(f"スナップショットが壊れています: {e}")
+        return None
+
+    for signature in snapshot["files"]:
+        if file_signature(signature[0]) != tuple(signature):
+            logger.info(f"ファイルが変更されたためスナップショットを使用しません: {signature[0]}")
+            return None
+
+    return snapshot["state"]
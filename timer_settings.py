@@ -8,24 +8,23 @@ logger = logging.getLogger(__name__)
 
 
 class TimerSettingsWindow:
+    """タイマー設定ウィンドウ
+
+    ウィンドウは初回表示時に一度だけ作成し、閉じる時は破棄せずに隠す。
+    再表示の際は現在の設定値を反映する。
+    """
+
     def __init__(self, parent, config, save_callback):
         self.window = tk.Toplevel(parent)
+        self.window.withdraw()
         self.window.title("タイマー設定")
-        # 設定ウィンドウのサイズと位置を復元
-        settings_window_config = config.get("settings_window", {
-            "position": {"x": 100, "y": 100},
-            "size": {"width": 300, "height": 320}
-        })
-        pos = settings_window_config["position"]
-        size = settings_window_config["size"]
-        self.window.geometry(f"{size['width']}x{size['height']}+{pos['x']}+{pos['y']}")
         self.window.resizable(True, True)
 
         self.config = config
         self.save_callback = save_callback
-        
-        # ウィンドウ位置の変更を監視
-        self.window.bind("<Configure>", self.on_window_configure)
+
+        # 閉じるボタンでは破棄せずに隠す
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
 
         # メインフレーム
         main_frame = ttk.Frame(self.window, padding="10")
@@ -35,7 +34,7 @@ class TimerSettingsWindow:
         work_frame = ttk.LabelFrame(main_frame, text="作業時間", padding="5")
         work_frame.pack(fill=tk.X, pady=5)
 
-        self.work_time = tk.StringVar(value=str(config["timer"]["work_time"]))
+        self.work_time = tk.StringVar()
         ttk.Label(work_frame, text="分").pack(side=tk.RIGHT)
         ttk.Entry(work_frame, textvariable=self.work_time, width=10).pack(side=tk.RIGHT)
 
@@ -43,7 +42,7 @@ class TimerSettingsWindow:
         break_frame = ttk.LabelFrame(main_frame, text="休憩時間", padding="5")
         break_frame.pack(fill=tk.X, pady=5)
 
-        self.break_time = tk.StringVar(value=str(config["timer"]["break_time"]))
+        self.break_time = tk.StringVar()
         ttk.Label(break_frame, text="分").pack(side=tk.RIGHT)
         ttk.Entry(break_frame, textvariable=self.break_time, width=10).pack(side=tk.RIGHT)
 
@@ -51,7 +50,7 @@ class TimerSettingsWindow:
         reminder_frame = ttk.LabelFrame(main_frame, text="通知間隔", padding="5")
         reminder_frame.pack(fill=tk.X, pady=5)
 
-        self.reminder_interval = tk.StringVar(value=str(config["timer"]["reminder_interval"]))
+        self.reminder_interval = tk.StringVar()
         ttk.Label(reminder_frame, text="回").pack(side=tk.RIGHT)
         ttk.Entry(reminder_frame, textvariable=self.reminder_interval, width=10).pack(side=tk.RIGHT)
         ttk.Label(reminder_frame, text="作業時間中に").pack(side=tk.LEFT)
@@ -60,7 +59,7 @@ class TimerSettingsWindow:
         volume_frame = ttk.LabelFrame(main_frame, text="音量", padding="5")
         volume_frame.pack(fill=tk.X, pady=5)
 
-        self.volume = tk.IntVar(value=config["sound"]["volume"])
+        self.volume = tk.IntVar()
         volume_scale = ttk.Scale(
             volume_frame,
             from_=0,
@@ -77,7 +76,7 @@ class TimerSettingsWindow:
         ttk.Button(
             button_frame,
             text="キャンセル",
-            command=self.window.destroy
+            command=self.hide
         ).pack(side=tk.RIGHT)
 
         ttk.Button(
@@ -92,24 +91,50 @@ class TimerSettingsWindow:
             command=lambda: self.save_settings(close_window=False)
         ).pack(side=tk.RIGHT, padx=5)
 
-        # モーダルウィンドウとして表示
         self.window.transient(parent)
+
+    def show(self, config=None):
+        """現在の設定値を反映してウィンドウを表示"""
+        if config is not None:
+            self.config = config
+
+        self.work_time.set(str(self.config["timer"]["work_time"]))
+        self.break_time.set(str(self.config["timer"]["break_time"]))
+        self.reminder_interval.set(str(self.config["timer"]["reminder_interval"]))
+        self.volume.set(self.config["sound"]["volume"])
+
+        # 設定ウィンドウのサイズと位置を復元
+        settings_window_config = self.config.get("settings_window", {
+            "position": {"x": 100, "y": 100},
+            "size": {"width": 300, "height": 320}
+        })
+        pos = settings_window_config["position"]
+        size = settings_window_config["size"]
+        self.window.geometry(f"{size['width']}x{size['height']}+{pos['x']}+{pos['y']}")
+
+        # モーダルウィンドウとして表示
+        self.window.deiconify()
+        self.window.lift()
         self.window.grab_set()
 
-    def on_window_configure(self, event):
-        """ウィンドウの位置とサイズが変更された時の処理"""
-        if event.widget == self.window:
-            # ウィンドウの現在の位置とサイズを取得
-            geometry = event.widget.geometry()
-            width, height, x, y = map(int, geometry.replace("+", "x").split("x"))
-            
-            # 設定を更新
-            if "settings_window" not in self.config:
-                self.config["settings_window"] = {}
-            self.config["settings_window"]["position"] = {"x": x, "y": y}
-            self.config["settings_window"]["size"] = {"width": width, "height": height}
+    def hide(self):
+        """ウィンドウの位置とサイズを保存して隠す"""
+        # ウィンドウの現在の位置とサイズを取得
+        geometry = self.window.geometry()
+        width, height, x, y = map(int, geometry.replace("+", "x").split("x"))
+
+        # 変更があった場合のみ設定を保存
+        window_config = {
+            "position": {"x": x, "y": y},
+            "size": {"width": width, "height": height},
+        }
+        if self.config.get("settings_window") != window_config:
+            self.config["settings_window"] = window_config
             save_config(self.config)
 
+        self.window.grab_release()
+        self.window.withdraw()
+
     def save_settings(self, close_window=True):
         """設定を保存"""
         try:
@@ -133,7 +158,7 @@ class TimerSettingsWindow:
 
             # 設定を保存
             if close_window:
-                self.window.destroy()
+                self.hide()
 
         except ValueError as e:
             logger.error(f"設定の保存に失敗: {e}")